@@ -1,10 +1,22 @@
+from __future__ import annotations
+
+import io
 import math
-from datetime import datetime
+import re
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import streamlit as st
 
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 st.set_page_config(page_title="Scope 3 Value Chain Dashboard", layout="wide")
 
 st.title("🌍 Scope 3 Value Chain Emissions Dashboard")
@@ -65,213 +77,545 @@ METHOD_HIERARCHY = {
     "Proxy Estimate": 1,
 }
 
+_CATEGORY_LIST = list(CATEGORIES.values())
+_SOURCE_LIST = list(EMISSION_FACTORS.keys())
+_METHOD_LIST = list(METHOD_HIERARCHY.keys())
+
+# Hierarchy scores indexed by method position; the trailing slot is the fallback for unknown methods.
+_METHOD_INDEX = {name: i for i, name in enumerate(METHOD_HIERARCHY)}
+_HIER_LUT = np.array([*METHOD_HIERARCHY.values(), 1]) / 5
+
+# Factor keys grouped by the prefix the sidebar looks them up by.
+_BY_PREFIX = {
+    src: {
+        "Transport -": [key for key in factors if key.startswith("Transport -")],
+        "Grid Electricity": [key for key in factors if "Grid Electricity" in key],
+    }
+    for src, factors in EMISSION_FACTORS.items()
+}
+
+
+@st.cache_resource
+def _factor_index() -> dict[str, dict]:
+    """Per-source factors the sidebar needs, resolved once instead of scanning keys on every rerun."""
+    index = {}
+    for src, factors in EMISSION_FACTORS.items():
+        transport_keys = _BY_PREFIX[src]["Transport -"]
+        grid_keys = _BY_PREFIX[src]["Grid Electricity"]
+        transport_key = transport_keys[0] if transport_keys else None
+        grid_key = grid_keys[0] if grid_keys else None
+        index[src] = {
+            "transport_key": transport_key,
+            "transport": factors.get(transport_key, 0.0),
+            "grid_key": grid_key,
+            "grid": factors.get(grid_key, 0.0),
+            "hotel": factors.get("Business Travel - Hotel (kgCO2e/night)", 0.0),
+            "air_economy": factors.get("Business Travel - Air Economy (kgCO2e/pkm)", 0.0),
+            "air_business": factors.get("Business Travel - Air Business (kgCO2e/pkm)", 0.0),
+        }
+    return index
+
 
 # -----------------------------
 # 3. CALCULATION ENGINE
 # -----------------------------
 
 
-def calculate_emissions(category_name: str, inputs: dict) -> tuple[float, str]:
-    if category_name == "Business Travel":
-        distance = inputs["distance_km"]
-        travel_factor = inputs["travel_factor"]
-        hotel_nights = inputs["hotel_nights"]
-        hotel_factor = inputs["hotel_factor"]
-        emissions = (distance * travel_factor) + (hotel_nights * hotel_factor)
-        return emissions, "Activity-Based"
-
-    if "Transportation" in category_name:
-        distance = inputs["distance_km"]
-        weight = inputs["weight_tonnes"]
-        factor = inputs["transport_factor"]
-        emissions = distance * weight * factor
-        return emissions, "Activity-Based"
-
-    if category_name == "Investments":
-        company_emissions = inputs["investee_emissions"]
-        outstanding_amount = inputs["outstanding_amount"]
-        evic = inputs["evic"]
-        attribution_factor = (outstanding_amount / evic) if evic else 0
-        emissions = company_emissions * attribution_factor
-        return emissions, "PCAF Financed Emissions"
-
-    if category_name == "Use of Sold Products":
-        lifetime_years = inputs["lifetime_years"]
-        annual_usage = inputs["annual_usage_kwh"]
-        grid_factor = inputs["grid_factor"]
-        emissions = lifetime_years * annual_usage * grid_factor
-        return emissions, "Activity-Based"
-
+def _business_travel(inputs: dict) -> tuple[float, str]:
+    distance = inputs["distance_km"]
+    travel_factor = inputs["travel_factor"]
+    hotel_nights = inputs["hotel_nights"]
+    hotel_factor = inputs["hotel_factor"]
+    if not distance and not hotel_nights:
+        return 0.0, "Activity-Based"
+    emissions = (distance * travel_factor) + (hotel_nights * hotel_factor)
+    return emissions, "Activity-Based"
+
+
+def _transport(inputs: dict) -> tuple[float, str]:
+    distance = inputs["distance_km"]
+    weight = inputs["weight_tonnes"]
+    factor = inputs["transport_factor"]
+    if not distance or not weight:
+        return 0.0, "Activity-Based"
+    emissions = distance * weight * factor
+    return emissions, "Activity-Based"
+
+
+def _investments(inputs: dict) -> tuple[float, str]:
+    company_emissions = inputs["investee_emissions"]
+    outstanding_amount = inputs["outstanding_amount"]
+    evic = inputs["evic"]
+    if not company_emissions or not outstanding_amount or not evic:
+        return 0.0, "PCAF Financed Emissions"
+    attribution_factor = outstanding_amount / evic
+    emissions = company_emissions * attribution_factor
+    return emissions, "PCAF Financed Emissions"
+
+
+def _use_phase(inputs: dict) -> tuple[float, str]:
+    lifetime_years = inputs["lifetime_years"]
+    annual_usage = inputs["annual_usage_kwh"]
+    grid_factor = inputs["grid_factor"]
+    if not lifetime_years or not annual_usage:
+        return 0.0, "Activity-Based"
+    emissions = lifetime_years * annual_usage * grid_factor
+    return emissions, "Activity-Based"
+
+
+def _generic(inputs: dict) -> tuple[float, str]:
     emissions = inputs.get("quantity", 0) * inputs.get("generic_factor", 0)
     return emissions, inputs.get("method", "Average-Data")
 
 
+_CAT_ID = {name: i for i, name in CATEGORIES.items()}
+_BUSINESS_TRAVEL_ID = 6
+_TRANSPORT_IDS = (4, 9)
+_INVESTMENTS_ID = 15
+_USE_PHASE_ID = 11
+
+DISPATCH = {
+    _BUSINESS_TRAVEL_ID: _business_travel,
+    **dict.fromkeys(_TRANSPORT_IDS, _transport),
+    _INVESTMENTS_ID: _investments,
+    _USE_PHASE_ID: _use_phase,
+}
+
+
+def calculate_emissions(category: str | int, inputs: dict) -> tuple[float, str]:
+    cat_id = _CAT_ID.get(category) if isinstance(category, str) else category
+    return DISPATCH.get(cat_id, _generic)(inputs)
+
+
+BATCH_INPUT_COLUMNS = [
+    "distance_km",
+    "travel_factor",
+    "hotel_nights",
+    "hotel_factor",
+    "weight_tonnes",
+    "transport_factor",
+    "investee_emissions",
+    "outstanding_amount",
+    "evic",
+    "lifetime_years",
+    "annual_usage_kwh",
+    "grid_factor",
+    "quantity",
+    "generic_factor",
+]
+
+
+def calculate_emissions_batch(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorised calculate_emissions over an entries frame (`Category`, `Method` and BATCH_INPUT_COLUMNS)."""
+    cat_id = df["Category"].astype(object).map(_CAT_ID).to_numpy()
+    x = df[BATCH_INPUT_COLUMNS].astype(float).fillna(0.0)
+
+    business_travel = x.distance_km * x.travel_factor + x.hotel_nights * x.hotel_factor
+    transport = x.distance_km * x.weight_tonnes * x.transport_factor
+    investments = x.investee_emissions * (x.outstanding_amount / x.evic.where(x.evic != 0)).fillna(0.0)
+    use_phase = x.lifetime_years * x.annual_usage_kwh * x.grid_factor
+    generic = x.quantity * x.generic_factor
+
+    conditions = [
+        cat_id == _BUSINESS_TRAVEL_ID,
+        np.isin(cat_id, _TRANSPORT_IDS),
+        cat_id == _INVESTMENTS_ID,
+        cat_id == _USE_PHASE_ID,
+    ]
+    emissions = np.select(conditions, [business_travel, transport, investments, use_phase], default=generic)
+
+    generic_method = df["Method"].astype(object).fillna("Average-Data") if "Method" in df else "Average-Data"
+    methods = np.select(
+        conditions,
+        ["Activity-Based", "Activity-Based", "PCAF Financed Emissions", "Activity-Based"],
+        default=np.broadcast_to(np.asarray(generic_method, dtype=object), len(df)),
+    )
+    return emissions, methods
+
+
 
 def calculate_data_quality(method: str, activity_uncertainty_pct: float, factor_uncertainty_pct: float, coverage_pct: float) -> tuple[float, float]:
     hierarchy_score = METHOD_HIERARCHY.get(method, 1) / 5
     combined_uncertainty = math.sqrt(activity_uncertainty_pct**2 + factor_uncertainty_pct**2)
     uncertainty_score = max(0.0, 1 - (combined_uncertainty / 100))
-    coverage_score = min(max(coverage_pct / 100, 0), 1)
+    coverage_frac = coverage_pct / 100
+    coverage_score = 0.0 if coverage_frac < 0 else 1.0 if coverage_frac > 1 else coverage_frac
 
     total_score = ((0.4 * hierarchy_score) + (0.3 * uncertainty_score) + (0.3 * coverage_score)) * 100
     return round(total_score, 1), round(combined_uncertainty, 2)
 
 
+def calculate_data_quality_vec(
+    methods: pd.Series, act_unc: np.ndarray, fac_unc: np.ndarray, cov: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorised calculate_data_quality for bulk recomputes (e.g. CSV import)."""
+    method_idx = methods.astype(object).map(_METHOD_INDEX).fillna(len(_METHOD_INDEX)).to_numpy(dtype=np.intp)
+    hierarchy_score = _HIER_LUT[method_idx]
+    combined_uncertainty = np.sqrt(np.square(act_unc) + np.square(fac_unc))
+    uncertainty_score = np.clip(1 - (combined_uncertainty / 100), 0.0, None)
+    coverage_score = np.clip(np.asarray(cov) / 100, 0.0, 1.0)
+
+    total_score = ((0.4 * hierarchy_score) + (0.3 * uncertainty_score) + (0.3 * coverage_score)) * 100
+    return np.round(total_score, 1), np.round(combined_uncertainty, 2)
+
+
+@st.cache_resource
+def _get_kernel():
+    """JIT-compile the fused bulk kernel on first use; None when numba is not installed."""
+    try:
+        from numba import njit, prange
+    except ImportError:  # numba is optional; bulk recomputes fall back to NumPy
+        return None
+
+    @njit(parallel=True, fastmath=True)
+    def _compute_all(cat_id, d, tf, hn, hf, w, trf, ie, oa, ev, ly, au, gf, q, genf, hier, act_unc, fac_unc, cov):
+        # Emissions and data quality fused into one pass over the inputs, with no temporaries.
+        n = cat_id.shape[0]
+        emissions = np.empty(n)
+        score = np.empty(n)
+        combined = np.empty(n)
+        for i in prange(n):
+            c = cat_id[i]
+            if c == _BUSINESS_TRAVEL_ID:
+                emissions[i] = d[i] * tf[i] + hn[i] * hf[i]
+            elif c == _TRANSPORT_IDS[0] or c == _TRANSPORT_IDS[1]:
+                emissions[i] = d[i] * w[i] * trf[i]
+            elif c == _INVESTMENTS_ID:
+                emissions[i] = ie[i] * oa[i] / ev[i] if ev[i] != 0 else 0.0
+            elif c == _USE_PHASE_ID:
+                emissions[i] = ly[i] * au[i] * gf[i]
+            else:
+                emissions[i] = q[i] * genf[i]
+
+            combined[i] = np.sqrt(act_unc[i] * act_unc[i] + fac_unc[i] * fac_unc[i])
+            uncertainty_score = 1 - combined[i] / 100
+            uncertainty_score = 0.0 if uncertainty_score < 0 else uncertainty_score
+            coverage_frac = cov[i] / 100
+            coverage_score = 0.0 if coverage_frac < 0 else 1.0 if coverage_frac > 1 else coverage_frac
+            score[i] = (0.4 * hier[i] + 0.3 * uncertainty_score + 0.3 * coverage_score) * 100
+        return emissions, score, combined
+
+    return _compute_all
+
+
+def calculate_all_batch(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Emissions, data quality score and combined uncertainty for every row of an entries frame.
+
+    JIT-compiled when numba is installed.
+    """
+    methods = df["Quality Method"]
+    act_unc = df["Activity Uncertainty (%)"].to_numpy(dtype=float)
+    fac_unc = df["Factor Uncertainty (%)"].to_numpy(dtype=float)
+    cov = df["Coverage (%)"].to_numpy(dtype=float)
+
+    compute_all = _get_kernel()
+    if compute_all is None:
+        emissions, _ = calculate_emissions_batch(df)
+        score, combined = calculate_data_quality_vec(methods, act_unc, fac_unc, cov)
+        return emissions, score, combined
+
+    cat_id = df["Category"].astype(object).map(_CAT_ID).fillna(0).to_numpy(dtype=np.int64)
+    x = df[BATCH_INPUT_COLUMNS].astype(float).fillna(0.0)
+    method_idx = methods.astype(object).map(_METHOD_INDEX).fillna(len(_METHOD_INDEX)).to_numpy(dtype=np.intp)
+    emissions, score, combined = compute_all(
+        cat_id,
+        *(x[col].to_numpy() for col in BATCH_INPUT_COLUMNS),
+        _HIER_LUT[method_idx],
+        act_unc,
+        fac_unc,
+        cov,
+    )
+    return emissions, np.round(score, 1), np.round(combined, 2)
+
+
 # -----------------------------
 # 4. DATA ENTRY SECTION
 # -----------------------------
 
 st.sidebar.header("➕ Add Scope 3 Activity")
 
-category = st.sidebar.selectbox("Select Category", list(CATEGORIES.values()))
-factor_dataset = st.sidebar.selectbox("Emission Factor Source", list(EMISSION_FACTORS.keys()))
+category = st.sidebar.selectbox("Select Category", _CATEGORY_LIST)
+factor_dataset = st.sidebar.selectbox("Emission Factor Source", _SOURCE_LIST)
 st.sidebar.caption(f"Source: {FACTOR_SOURCES[factor_dataset]}")
+source_factors = _factor_index()[factor_dataset]
+category_id = _CAT_ID[category]
+
+# Category, source and travel class stay outside the form because they decide which inputs
+# and factors are shown; everything else is batched so edits do not rerun the script until
+# "Add Entry" is pressed.
+if category_id == _BUSINESS_TRAVEL_ID:
+    travel_class = st.sidebar.selectbox("Travel class", ["Air Economy", "Air Business"])
+
+entry_form = st.sidebar.form("entry_form")
 
 inputs = {}
 
-if category == "Business Travel":
-    st.sidebar.subheader("Business Travel Inputs")
-    inputs["distance_km"] = st.sidebar.number_input("Travel distance (km)", min_value=0.0)
-    travel_class = st.sidebar.selectbox("Travel class", ["Air Economy", "Air Business"])
+if category_id == _BUSINESS_TRAVEL_ID:
+    entry_form.subheader("Business Travel Inputs")
+    inputs["distance_km"] = entry_form.number_input("Travel distance (km)", min_value=0.0)
     travel_key = f"Business Travel - {travel_class} (kgCO2e/pkm)"
-    inputs["travel_factor"] = EMISSION_FACTORS[factor_dataset].get(travel_key, 0.0)
+    inputs["travel_factor"] = source_factors[travel_class.lower().replace(" ", "_")]
     if inputs["travel_factor"] == 0.0:
-        st.sidebar.warning(f"Travel EF '{travel_key}' not found for source {factor_dataset}; using 0.0")
-    st.sidebar.write(f"Travel EF: **{inputs['travel_factor']} kgCO2e/pkm**")
+        entry_form.warning(f"Travel EF '{travel_key}' not found for source {factor_dataset}; using 0.0")
+    entry_form.write(f"Travel EF: **{inputs['travel_factor']} kgCO2e/pkm**")
 
-    inputs["hotel_nights"] = st.sidebar.number_input("Hotel nights", min_value=0.0)
+    inputs["hotel_nights"] = entry_form.number_input("Hotel nights", min_value=0.0)
     hotel_key = "Business Travel - Hotel (kgCO2e/night)"
-    inputs["hotel_factor"] = EMISSION_FACTORS[factor_dataset].get(hotel_key, 0.0)
+    inputs["hotel_factor"] = source_factors["hotel"]
     if inputs["hotel_factor"] == 0.0:
-        st.sidebar.warning(f"Hotel EF '{hotel_key}' not found for source {factor_dataset}; using 0.0")
-    st.sidebar.write(f"Hotel EF: **{inputs['hotel_factor']} kgCO2e/night**")
+        entry_form.warning(f"Hotel EF '{hotel_key}' not found for source {factor_dataset}; using 0.0")
+    entry_form.write(f"Hotel EF: **{inputs['hotel_factor']} kgCO2e/night**")
 
-elif "Transportation" in category:
-    st.sidebar.subheader("Transport Inputs")
-    inputs["distance_km"] = st.sidebar.number_input("Distance (km)", min_value=0.0)
-    inputs["weight_tonnes"] = st.sidebar.number_input("Weight transported (tonnes)", min_value=0.0)
+elif category_id in _TRANSPORT_IDS:
+    entry_form.subheader("Transport Inputs")
+    inputs["distance_km"] = entry_form.number_input("Distance (km)", min_value=0.0)
+    inputs["weight_tonnes"] = entry_form.number_input("Weight transported (tonnes)", min_value=0.0)
 
-    transport_key = next((key for key in EMISSION_FACTORS[factor_dataset] if "Transport -" in key), None)
+    transport_key = source_factors["transport_key"]
     if transport_key is None:
         inputs["transport_factor"] = 0.0
-        st.sidebar.warning(f"No transport emission factor found for source {factor_dataset}; using 0.0")
-        st.sidebar.write(f"Transport EF: **{inputs['transport_factor']} kgCO2e/tonne-km**")
+        entry_form.warning(f"No transport emission factor found for source {factor_dataset}; using 0.0")
+        entry_form.write(f"Transport EF: **{inputs['transport_factor']} kgCO2e/tonne-km**")
     else:
-        inputs["transport_factor"] = EMISSION_FACTORS[factor_dataset].get(transport_key, 0.0)
-        st.sidebar.write(f"Transport EF ({transport_key.split(' - ')[1]}): **{inputs['transport_factor']} kgCO2e/tonne-km**")
-
-elif category == "Investments":
-    st.sidebar.subheader("Investments Inputs (PCAF)")
-    st.sidebar.caption("Financed emissions = Investee emissions × (Outstanding amount / EVIC)")
-    inputs["investee_emissions"] = st.sidebar.number_input("Investee emissions (kgCO2e)", min_value=0.0)
-    inputs["outstanding_amount"] = st.sidebar.number_input("Outstanding amount invested (£)", min_value=0.0)
-    inputs["evic"] = st.sidebar.number_input("Enterprise value including cash (EVIC) (£)", min_value=0.0)
-
-elif category == "Use of Sold Products":
-    st.sidebar.subheader("Use Phase Inputs")
-    inputs["lifetime_years"] = st.sidebar.number_input("Product lifetime (years)", min_value=0.0)
-    inputs["annual_usage_kwh"] = st.sidebar.number_input("Annual usage (kWh/year)", min_value=0.0)
-
-    grid_key = next((key for key in EMISSION_FACTORS[factor_dataset] if "Grid Electricity" in key), None)
+        inputs["transport_factor"] = source_factors["transport"]
+        entry_form.write(f"Transport EF ({transport_key.split(' - ')[1]}): **{inputs['transport_factor']} kgCO2e/tonne-km**")
+
+elif category_id == _INVESTMENTS_ID:
+    entry_form.subheader("Investments Inputs (PCAF)")
+    entry_form.caption("Financed emissions = Investee emissions × (Outstanding amount / EVIC)")
+    inputs["investee_emissions"] = entry_form.number_input("Investee emissions (kgCO2e)", min_value=0.0)
+    inputs["outstanding_amount"] = entry_form.number_input("Outstanding amount invested (£)", min_value=0.0)
+    inputs["evic"] = entry_form.number_input("Enterprise value including cash (EVIC) (£)", min_value=0.0)
+
+elif category_id == _USE_PHASE_ID:
+    entry_form.subheader("Use Phase Inputs")
+    inputs["lifetime_years"] = entry_form.number_input("Product lifetime (years)", min_value=0.0)
+    inputs["annual_usage_kwh"] = entry_form.number_input("Annual usage (kWh/year)", min_value=0.0)
+
+    grid_key = source_factors["grid_key"]
     if grid_key is None:
         inputs["grid_factor"] = 0.0
-        st.sidebar.warning(f"No grid electricity factor found for source {factor_dataset}; using 0.0")
+        entry_form.warning(f"No grid electricity factor found for source {factor_dataset}; using 0.0")
     else:
-        inputs["grid_factor"] = EMISSION_FACTORS[factor_dataset].get(grid_key, 0.0)
-    st.sidebar.write(f"Grid EF: **{inputs['grid_factor']} kgCO2e/kWh**")
+        inputs["grid_factor"] = source_factors["grid"]
+    entry_form.write(f"Grid EF: **{inputs['grid_factor']} kgCO2e/kWh**")
 
 else:
-    st.sidebar.subheader("Generic Inputs")
-    inputs["method"] = st.sidebar.selectbox("Calculation Method", list(METHOD_HIERARCHY.keys()))
-    inputs["quantity"] = st.sidebar.number_input("Activity quantity", min_value=0.0)
-    inputs["generic_factor"] = st.sidebar.number_input("Emission factor (kgCO2e/unit)", min_value=0.0)
-
-st.sidebar.subheader("Data Quality")
-quality_method = st.sidebar.selectbox("Method hierarchy", list(METHOD_HIERARCHY.keys()), index=1)
-activity_uncertainty = st.sidebar.slider("Activity data uncertainty (%)", 0, 100, 20)
-factor_uncertainty = st.sidebar.slider("Emission factor uncertainty (%)", 0, 100, 15)
-coverage_pct = st.sidebar.slider("Data coverage (%)", 0, 100, 85)
-
-add_button = st.sidebar.button("Add Entry")
-
-if "data" not in st.session_state:
-    st.session_state.data = pd.DataFrame(
-        columns=[
-            "Date",
-            "Category",
-            "Source",
-            "Method",
-            "Emissions (kgCO2e)",
-            "Coverage (%)",
-            "Combined Uncertainty (%)",
-            "Data Quality Score",
-            "Details",
-        ]
-    )
+    entry_form.subheader("Generic Inputs")
+    inputs["method"] = entry_form.selectbox("Calculation Method", _METHOD_LIST)
+    inputs["quantity"] = entry_form.number_input("Activity quantity", min_value=0.0)
+    inputs["generic_factor"] = entry_form.number_input("Emission factor (kgCO2e/unit)", min_value=0.0)
+
+entry_form.subheader("Data Quality")
+quality_method = entry_form.selectbox("Method hierarchy", _METHOD_LIST, index=1)
+activity_uncertainty = entry_form.slider("Activity data uncertainty (%)", 0, 100, 20)
+factor_uncertainty = entry_form.slider("Emission factor uncertainty (%)", 0, 100, 15)
+coverage_pct = entry_form.slider("Data coverage (%)", 0, 100, 85)
+
+skip_empty_entries = entry_form.checkbox("Skip entries with zero emissions", value=False)
+add_button = entry_form.form_submit_button("Add Entry")
+save_button = st.sidebar.button("Save Entries")
+
+ENTRY_COLUMNS = [
+    "Date",
+    "Category",
+    "Source",
+    "Method",
+    "Emissions (kgCO2e)",
+    "Coverage (%)",
+    "Combined Uncertainty (%)",
+    "Data Quality Score",
+    "Quality Method",
+    "Activity Uncertainty (%)",
+    "Factor Uncertainty (%)",
+    *BATCH_INPUT_COLUMNS,
+]
+
+ENTRY_DTYPES = {
+    "Date": "datetime64[ns, UTC]",
+    "Category": pd.CategoricalDtype(_CATEGORY_LIST),
+    "Source": pd.CategoricalDtype(_SOURCE_LIST),
+    "Method": pd.CategoricalDtype([*_METHOD_LIST, "PCAF Financed Emissions"]),
+    "Coverage (%)": "float32",
+    "Combined Uncertainty (%)": "float32",
+    "Data Quality Score": "float32",
+    "Quality Method": pd.CategoricalDtype(_METHOD_LIST),
+    "Activity Uncertainty (%)": "float32",
+    "Factor Uncertainty (%)": "float32",
+}
 
-if add_button:
-    emissions, calc_method = calculate_emissions(category, inputs)
-    data_quality_score, combined_uncertainty = calculate_data_quality(
-        quality_method,
-        activity_uncertainty,
-        factor_uncertainty,
-        coverage_pct,
-    )
+CHECKPOINT_ROOT = Path(__file__).resolve().parent / ".scope3_cache" / "entries"
+CHECKPOINT_BATCH_SIZE = 32
+
+
+def checkpoint_dir(checkpoint_id: str) -> Path:
+    return CHECKPOINT_ROOT / f"session={checkpoint_id}"
 
-    new_row = {
-        "Date": datetime.now(),
-        "Category": category,
-        "Source": factor_dataset,
-        "Method": calc_method,
-        "Emissions (kgCO2e)": round(emissions, 2),
-        "Coverage (%)": coverage_pct,
-        "Combined Uncertainty (%)": combined_uncertainty,
-        "Data Quality Score": data_quality_score,
-        "Details": str(inputs),
-    }
-    st.session_state.data = pd.concat([st.session_state.data, pd.DataFrame([new_row])], ignore_index=True)
-    st.success("Entry added successfully")
+
+def load_checkpoint(checkpoint_id: str) -> list[dict]:
+    path = checkpoint_dir(checkpoint_id)
+    if not any(path.rglob("*.parquet")):
+        return []
+    # The dataset comes back grouped by the Source partition; restore entry order.
+    saved = pd.read_parquet(path).sort_values("Date", kind="stable")
+    saved["Source"] = saved["Source"].astype(str)
+    return saved.to_dict("records")
+
+
+def write_checkpoint(checkpoint_id: str, buffer: list[dict]) -> None:
+    pq.write_to_dataset(pa.Table.from_pylist(buffer), root_path=str(checkpoint_dir(checkpoint_id)), partition_cols=["Source"])
+    buffer.clear()
+
+
+# Entries are kept as a list of dicts; the DataFrame is only built at render time.
+# Each session checkpoints to its own Parquet dataset, identified by the `session` query
+# parameter, so reloading the page restores that session's entries and nobody else's.
+# `session_id` is separate and fresh per Streamlit session; it only keys the render caches.
+# New entries are buffered in `pending` and written every CHECKPOINT_BATCH_SIZE entries or
+# on "Save Entries"; anything still pending when the session ends is lost.
+if "rows" not in st.session_state:
+    checkpoint_id = st.query_params.get("session", "")
+    if not re.fullmatch(r"[0-9a-f]{32}", checkpoint_id):
+        checkpoint_id = uuid.uuid4().hex
+        st.query_params["session"] = checkpoint_id
+    st.session_state.checkpoint_id = checkpoint_id
+    st.session_state.rows = load_checkpoint(checkpoint_id)
+    st.session_state.pending = []
+    st.session_state.version = 0
+    st.session_state.session_id = uuid.uuid4().hex
+
+st.sidebar.caption(f"Entries are saved automatically every {CHECKPOINT_BATCH_SIZE} additions; save before closing to keep the rest.")
+
+if add_button:
+    emissions, calc_method = calculate_emissions(category_id, inputs)
+    if skip_empty_entries and emissions == 0.0:
+        st.sidebar.warning("Emissions are zero — entry skipped")
+    else:
+        data_quality_score, combined_uncertainty = calculate_data_quality(
+            quality_method,
+            activity_uncertainty,
+            factor_uncertainty,
+            coverage_pct,
+        )
+
+        new_row = {
+            "Date": pd.Timestamp.now(tz="UTC"),
+            "Category": category,
+            "Source": factor_dataset,
+            "Method": calc_method,
+            "Emissions (kgCO2e)": round(emissions, 2),
+            "Coverage (%)": coverage_pct,
+            "Combined Uncertainty (%)": combined_uncertainty,
+            "Data Quality Score": data_quality_score,
+            "Quality Method": quality_method,
+            "Activity Uncertainty (%)": activity_uncertainty,
+            "Factor Uncertainty (%)": factor_uncertainty,
+        }
+        # Raw inputs are stored as typed numeric columns (NaN where unused) so emissions and data
+        # quality can be recomputed in bulk.
+        new_row.update({key: inputs.get(key, np.nan) for key in BATCH_INPUT_COLUMNS})
+        st.session_state.rows.append(new_row)
+        st.session_state.pending.append(new_row)
+        st.session_state.version += 1
+        st.success("Entry added successfully")
+
+if st.session_state.pending and (save_button or len(st.session_state.pending) >= CHECKPOINT_BATCH_SIZE):
+    write_checkpoint(st.session_state.checkpoint_id, st.session_state.pending)
+    if save_button:
+        st.success("Entries saved")
 
 # -----------------------------
 # 5. DASHBOARD DISPLAY
 # -----------------------------
 
+
+# Cached results are keyed on (session_id, version) so reruns that do not add an
+# entry skip the pandas work; the frames themselves are not hashed.
+@st.cache_data(max_entries=256)
+def _aggregate(session_id: str, version: int, _df: pd.DataFrame):
+    total_emissions = float(_df["Emissions (kgCO2e)"].sum())
+    avg_quality = float(_df["Data Quality Score"].mean())
+    avg_coverage = float(_df["Coverage (%)"].mean())
+    by_category = (
+        _df.groupby("Category", observed=True)
+        .agg(
+            Emissions=("Emissions (kgCO2e)", "sum"),
+            Quality=("Data Quality Score", "mean"),
+            Uncertainty=("Combined Uncertainty (%)", "mean"),
+        )
+        .reset_index()
+    )
+    return total_emissions, avg_quality, avg_coverage, by_category
+
+
+# Figures are shared across reruns and sessions whenever the aggregated values are identical.
+# Plotly is imported lazily so the empty-state first paint does not pay for it.
+@st.cache_resource(max_entries=256)
+def _pie(categories: tuple, emissions: tuple) -> go.Figure:
+    import plotly.express as px
+
+    return px.pie(
+        names=list(categories),
+        values=list(emissions),
+        labels={"names": "Category", "values": "Emissions (kgCO2e)"},
+        title="Emissions by Scope 3 Category",
+    )
+
+
+@st.cache_resource(max_entries=256)
+def _quality_bar(categories: tuple, quality: tuple, uncertainty: tuple) -> go.Figure:
+    import plotly.express as px
+
+    return px.bar(
+        x=list(categories),
+        y=list(quality),
+        color=list(uncertainty),
+        labels={"x": "Category", "y": "Data Quality Score", "color": "Combined Uncertainty (%)"},
+        title="Data Quality by Category",
+    )
+
+
+@st.cache_data(max_entries=256)
+def _csv_bytes(session_id: str, version: int, _df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(_df, preserve_index=False), buf)
+    return buf.getvalue()
+
+
+# The typed frame is rebuilt only when an entry has been added since it was last built.
+if st.session_state.get("frame_version") != st.session_state.version:
+    st.session_state.frame = pd.DataFrame(st.session_state.rows, columns=ENTRY_COLUMNS).astype(ENTRY_DTYPES)
+    st.session_state.frame_version = st.session_state.version
+df = st.session_state.frame
+
 st.header("📊 Emissions Overview")
 
-if not st.session_state.data.empty:
-    total_emissions = st.session_state.data["Emissions (kgCO2e)"].sum()
-    avg_quality = st.session_state.data["Data Quality Score"].mean()
-    avg_coverage = st.session_state.data["Coverage (%)"].mean()
+if not df.empty:
+    data_key = (st.session_state.session_id, st.session_state.version)
+    total_emissions, avg_quality, avg_coverage, by_category = _aggregate(*data_key, df)
+
+    total_t = total_emissions * 0.001
+    coverage_frac = 0.0 if avg_coverage < 0 else 1.0 if avg_coverage > 100 else avg_coverage / 100.0
 
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Scope 3 Emissions (kgCO2e)", round(total_emissions, 2))
-    col2.metric("Total Scope 3 Emissions (tCO2e)", round(total_emissions / 1000, 2))
+    col1.metric("Total Scope 3 Emissions (kgCO2e)", f"{total_emissions:.2f}")
+    col2.metric("Total Scope 3 Emissions (tCO2e)", f"{total_t:.2f}")
     col3.metric("Average Data Quality Score", f"{avg_quality:.1f}/100")
 
-    st.progress(min(max(avg_coverage / 100, 0), 1), text=f"Average coverage: {avg_coverage:.1f}%")
+    st.progress(coverage_frac, text=f"Average coverage: {avg_coverage:.1f}%")
+
+    chart_data = {col: tuple(vals) for col, vals in by_category.to_dict(orient="list").items()}
 
-    category_group = st.session_state.data.groupby("Category")["Emissions (kgCO2e)"].sum().reset_index()
-    fig = px.pie(category_group, names="Category", values="Emissions (kgCO2e)", title="Emissions by Scope 3 Category")
+    fig = _pie(chart_data["Category"], chart_data["Emissions"])
     st.plotly_chart(fig, use_container_width=True)
 
-    quality_by_category = (
-        st.session_state.data.groupby("Category")[["Data Quality Score", "Combined Uncertainty (%)"]]
-        .mean()
-        .reset_index()
-    )
-    quality_fig = px.bar(
-        quality_by_category,
-        x="Category",
-        y="Data Quality Score",
-        color="Combined Uncertainty (%)",
-        title="Data Quality by Category",
-    )
+    quality_fig = _quality_bar(chart_data["Category"], chart_data["Quality"], chart_data["Uncertainty"])
     st.plotly_chart(quality_fig, use_container_width=True)
 
     st.subheader("Detailed Activity Data")
-    st.dataframe(st.session_state.data)
+    st.dataframe(df)
 
-    csv = st.session_state.data.to_csv(index=False).encode("utf-8")
+    csv = _csv_bytes(*data_key, df)
     st.download_button("Download CSV Report", csv, "scope3_report.csv", "text/csv")
 else:
     st.info("No data entered yet. Add entries from the sidebar.")